@@ -8,11 +8,18 @@ from typing import Any
 from fastapi import APIRouter, Depends
 
 from core.config import DB_FILE, DB_TEST_FILE
-from core.database import get_db
+from core.database import get_db, pool
 from models.schemas import UpdateEntityRequest
 
 router = APIRouter()
 
+# Kept as a constant so each pooled connection reuses its prepared statement
+_SQL_PHOTO_ENTITIES = """
+    SELECT e.id, e.entity_type, e.entity_name, e.bounding_box
+    FROM entities e
+    WHERE e.photo_id = ?
+"""
+
 
 def parse_name(full_name: str) -> tuple[str, str]:
     """Splits a full name into first and last name components."""
@@ -23,32 +30,30 @@ def parse_name(full_name: str) -> tuple[str, str]:
 
 
 @router.get("/photo/{photo_id}/entities")
-async def get_photo_entities(photo_id: int, db: sqlite3.Connection = Depends(get_db)) -> list[dict[str, Any]]:
+def get_photo_entities(photo_id: int, db: sqlite3.Connection = Depends(get_db)) -> list[dict[str, Any]]:
     """Gets ALL entities (both identified and unidentified) for a specific photo."""
     cursor = db.cursor()
-    cursor.execute(
-        """
-        SELECT e.id, e.entity_type, e.entity_name, e.bounding_box
-        FROM entities e
-        WHERE e.photo_id = ?
-    """,
-        (photo_id,),
-    )
+    cursor.execute(_SQL_PHOTO_ENTITIES, (photo_id,))
     results = cursor.fetchall()
     return [{"id": row[0], "type": row[1], "name": row[2], "bounding_box": row[3]} for row in results]
 
 
 @router.get("/unidentified")
-async def get_unidentified_entities(db: sqlite3.Connection = Depends(get_db)) -> list[dict[str, Any]]:
+def get_unidentified_entities(db: sqlite3.Connection = Depends(get_db)) -> list[dict[str, Any]]:
     """Gets a list of people/pets that currently have an 'Unknown' name."""
     cursor = db.cursor()
-    # Group by name to just return one instance of each unknown person/pet
+    # Pick the lowest entity id per unknown name so the representative crop is stable between calls
     cursor.execute("""
-        SELECT e.id, e.entity_type, e.entity_name, p.id, e.bounding_box
-        FROM entities e
-        JOIN photos p ON e.photo_id = p.id
-        WHERE e.entity_name LIKE 'Unknown%' AND p.status = 'processed'
-        GROUP BY e.entity_name, e.entity_type
+        WITH ranked AS (
+            SELECT e.id, e.entity_type, e.entity_name, p.id AS photo_id, e.bounding_box,
+                   ROW_NUMBER() OVER (PARTITION BY e.entity_name, e.entity_type ORDER BY e.id) AS rn
+            FROM entities e
+            JOIN photos p ON e.photo_id = p.id
+            WHERE e.entity_name LIKE 'Unknown%' AND p.status = 'processed'
+        )
+        SELECT id, entity_type, entity_name, photo_id, bounding_box
+        FROM ranked
+        WHERE rn = 1
     """)
     results = cursor.fetchall()
 
@@ -58,7 +63,7 @@ async def get_unidentified_entities(db: sqlite3.Connection = Depends(get_db)) ->
 
 
 @router.post("/entities/name")
-async def name_main_entity(req: UpdateEntityRequest, db: sqlite3.Connection = Depends(get_db)) -> dict[str, Any]:
+def name_main_entity(req: UpdateEntityRequest, db: sqlite3.Connection = Depends(get_db)) -> dict[str, Any]:
     """Updates the name of a person in the MAIN database globally."""
     cursor = db.cursor()
 
@@ -83,83 +88,77 @@ async def name_main_entity(req: UpdateEntityRequest, db: sqlite3.Connection = De
     )
     db.commit()
 
-    # We must globally clear the gallery LRU cache when a name is merged so it updates
-    from api.routes.gallery import _compute_gallery_filters
+    # We must globally invalidate the gallery filter cache when a name is merged so it updates
+    from api.routes.gallery import clear_gallery_filters_cache
 
-    _compute_gallery_filters.cache_clear()
+    clear_gallery_filters_cache()
 
     return {"success": True, "updated": old_name, "to": new_name}
 
 
 @router.delete("/entities/id/{entity_id}")
-async def delete_main_entity(entity_id: int, db: sqlite3.Connection = Depends(get_db)) -> dict[str, Any]:
+def delete_main_entity(entity_id: int, db: sqlite3.Connection = Depends(get_db)) -> dict[str, Any]:
     """Deletes a specific entity instance from a photo in the MAIN db."""
     cursor = db.cursor()
     cursor.execute("DELETE FROM entities WHERE id = ?", (entity_id,))
     db.commit()
 
-    # We must globally clear the gallery LRU cache when an entity is dropped
-    from api.routes.gallery import _compute_gallery_filters
+    # We must globally invalidate the gallery filter cache when an entity is dropped
+    from api.routes.gallery import clear_gallery_filters_cache
 
-    _compute_gallery_filters.cache_clear()
+    clear_gallery_filters_cache()
 
     return {"success": True, "deleted_id": entity_id}
 
 
 @router.post("/test/entities/name")
-async def name_test_entity(req: UpdateEntityRequest) -> dict[str, Any]:
+def name_test_entity(req: UpdateEntityRequest) -> dict[str, Any]:
     """Updates the name of a person in the TEST database."""
     # We manage connections manually since we act on both test and prod
-    conn = sqlite3.connect(DB_TEST_FILE)
-    cursor = conn.cursor()
-
-    old_name = str(req.entity_id)  # ScanTest passes the current name as the ID
-    new_name = str(req.new_name).strip() if req.new_name else ""
-
-    # Check if this person already exists in the test DB to merge identities
-    cursor.execute(
-        "SELECT first_name, last_name FROM entities WHERE entity_type = 'person' AND entity_name = ? COLLATE NOCASE LIMIT 1",
-        (new_name,),
-    )
-    existing_person = cursor.fetchone()
-
-    if existing_person:
-        first, last = existing_person
-    else:
-        # Check main DB for the identity
-        try:
-            main_conn = sqlite3.connect(DB_FILE)
-            main_cursor = main_conn.cursor()
-            main_cursor.execute(
-                "SELECT first_name, last_name FROM entities WHERE entity_type = 'person' AND entity_name = ? COLLATE NOCASE LIMIT 1",
-                (new_name,),
-            )
-            main_existing = main_cursor.fetchone()
-            main_conn.close()
-
-            if main_existing:
-                first, last = main_existing
-            else:
+    with pool.connection(DB_TEST_FILE) as conn:
+        cursor = conn.cursor()
+
+        old_name = str(req.entity_id)  # ScanTest passes the current name as the ID
+        new_name = str(req.new_name).strip() if req.new_name else ""
+
+        # Check if this person already exists in the test DB to merge identities
+        cursor.execute(
+            "SELECT first_name, last_name FROM entities WHERE entity_type = 'person' AND entity_name = ? COLLATE NOCASE LIMIT 1",
+            (new_name,),
+        )
+        existing_person = cursor.fetchone()
+
+        if existing_person:
+            first, last = existing_person
+        else:
+            # Check main DB for the identity
+            try:
+                with pool.connection(DB_FILE) as main_conn:
+                    main_existing = main_conn.execute(
+                        "SELECT first_name, last_name FROM entities WHERE entity_type = 'person' AND entity_name = ? COLLATE NOCASE LIMIT 1",
+                        (new_name,),
+                    ).fetchone()
+
+                if main_existing:
+                    first, last = main_existing
+                else:
+                    first, last = parse_name(new_name)
+            except Exception:
                 first, last = parse_name(new_name)
-        except Exception:
-            first, last = parse_name(new_name)
 
-    cursor.execute(
-        "UPDATE entities SET entity_name = ?, first_name = ?, last_name = ? WHERE entity_name = ?",
-        (new_name, first, last, old_name),
-    )
-    conn.commit()
-    conn.close()
+        cursor.execute(
+            "UPDATE entities SET entity_name = ?, first_name = ?, last_name = ? WHERE entity_name = ?",
+            (new_name, first, last, old_name),
+        )
+        conn.commit()
 
     return {"success": True, "updated": old_name, "to": new_name}
 
 
 @router.delete("/test/entities/id/{entity_id}")
-async def delete_test_entity(entity_id: int) -> dict[str, Any]:
+def delete_test_entity(entity_id: int) -> dict[str, Any]:
     """Deletes a specific entity instance from a photo in the TEST db."""
-    conn = sqlite3.connect(DB_TEST_FILE)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM entities WHERE id = ?", (entity_id,))
-    conn.commit()
-    conn.close()
+    with pool.connection(DB_TEST_FILE) as conn:
+        conn.execute("DELETE FROM entities WHERE id = ?", (entity_id,))
+        conn.commit()
     return {"success": True, "deleted_id": entity_id}
@@ -1,7 +1,9 @@
-import io
+import json
 import os
 import sqlite3
-from functools import lru_cache
+import threading
+import time
+from collections import defaultdict
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -9,7 +11,8 @@ from fastapi.responses import FileResponse, Response
 from PIL import Image
 
 from core.config import DB_FILE, DB_TEST_FILE
-from core.database import get_db
+from core.database import get_db, pool
+from services.image_service import encode_jpeg_bytes, heic_cache_path, schedule_heic_cache
 
 # Register HEIC/HEIF support with Pillow
 try:
@@ -23,10 +26,39 @@ router = APIRouter()
 
 HEIC_EXTENSIONS = {".heic", ".heif"}
 
+# Hot-path queries kept as constants so each pooled connection reuses its prepared statement
+_SQL_PHOTO_PATH = "SELECT filepath FROM photos WHERE id = ?"
+
+_SQL_PHOTO_DETAIL = """
+    SELECT id, filepath, filename, description, status, date_created, date_modified, date_taken,
+           camera_make, camera_model
+    FROM photos WHERE id = ?
+"""
+
+_SQL_PHOTO_ENTITIES = """
+    SELECT id, entity_type, entity_name, bounding_box
+    FROM entities
+    WHERE photo_id = ?
+"""
+
+_SQL_GALLERY_YEARS = """
+    SELECT SUBSTR(date_taken, 1, 4) as year, COUNT(*) as count
+    FROM photos
+    WHERE date_taken IS NOT NULL AND date_taken != '' AND status = 'processed'
+    GROUP BY year
+    ORDER BY year DESC
+"""
+
+
+# Gallery filters are recomputed at most once per TTL, or sooner after a mutation marks them dirty
+GALLERY_FILTERS_TTL = 60.0
+_gallery_filters_cache: dict[str, Any] = {"at": 0.0, "dirty_at": 0.0, "db_file": None, "data": None}
+_gallery_filters_lock = threading.Lock()
+
 
 def clear_gallery_filters_cache() -> None:
     """Invalidate cached gallery filter metadata after photo/entity changes."""
-    _compute_gallery_filters.cache_clear()
+    _gallery_filters_cache["dirty_at"] = time.monotonic()
 
 
 def _serve_image(filepath: str, headers: dict[str, str]) -> Response:
@@ -36,38 +68,33 @@ def _serve_image(filepath: str, headers: dict[str, str]) -> Response:
         return FileResponse(filepath, headers=headers)
 
     # Check for a cached JPEG conversion alongside the original
-    cached_path = filepath + ".jpg"
+    cached_path = heic_cache_path(filepath)
     if os.path.exists(cached_path):
         return FileResponse(cached_path, media_type="image/jpeg", headers=headers)
 
-    # Convert HEIC → JPEG and cache to disk
+    # Convert HEIC → JPEG and cache to disk, joining any conversion the scanner already queued
     try:
-        img = Image.open(filepath)
-        img.save(cached_path, format="JPEG", quality=90)
+        pending = schedule_heic_cache(filepath)
+        if pending is not None:
+            pending.result()
         return FileResponse(cached_path, media_type="image/jpeg", headers=headers)
     except Exception:
         # Fallback: convert in-memory without caching
         try:
             img = Image.open(filepath)
-            buf = io.BytesIO()
-            img.save(buf, format="JPEG", quality=90)
-            buf.seek(0)
-            return Response(content=buf.getvalue(), media_type="image/jpeg", headers=headers)
+            return Response(content=encode_jpeg_bytes(img), media_type="image/jpeg", headers=headers)
         except Exception:
             # Last resort: serve raw file and let the browser try
             return FileResponse(filepath, headers=headers)
 
 
 @router.get("/image/{photo_id}", response_model=None)
-async def get_image(photo_id: int) -> Response:
+def get_image(photo_id: int) -> Response:
     """Returns the actual image file for a given photo ID."""
     row = None
     for db_path in (DB_FILE, DB_TEST_FILE):
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT filepath FROM photos WHERE id = ?", (photo_id,))
-        row = cursor.fetchone()
-        conn.close()
+        with pool.connection(db_path) as conn:
+            row = conn.execute(_SQL_PHOTO_PATH, (photo_id,)).fetchone()
         if row:
             break
 
@@ -85,19 +112,12 @@ async def get_image(photo_id: int) -> Response:
 
 
 @router.get("/photo/{photo_id}/detail")
-async def get_photo_detail(photo_id: int, db: sqlite3.Connection = Depends(get_db)) -> dict[str, Any]:
+def get_photo_detail(photo_id: int, db: sqlite3.Connection = Depends(get_db)) -> dict[str, Any]:
     """Returns comprehensive metadata and entity breakdown for a specific photo."""
     cursor = db.cursor()
 
     # 1. Fetch Core Metadata
-    cursor.execute(
-        """
-        SELECT id, filepath, filename, description, status, date_created, date_modified, date_taken,
-               camera_make, camera_model
-        FROM photos WHERE id = ?
-    """,
-        (photo_id,),
-    )
+    cursor.execute(_SQL_PHOTO_DETAIL, (photo_id,))
 
     row = cursor.fetchone()
     if not row:
@@ -118,14 +138,7 @@ async def get_photo_detail(photo_id: int, db: sqlite3.Connection = Depends(get_d
     }
 
     # 2. Fetch Associated Entities
-    cursor.execute(
-        """
-        SELECT id, entity_type, entity_name, bounding_box
-        FROM entities
-        WHERE photo_id = ?
-    """,
-        (photo_id,),
-    )
+    cursor.execute(_SQL_PHOTO_ENTITIES, (photo_id,))
 
     entities = []
     for erow in cursor.fetchall():
@@ -136,7 +149,7 @@ async def get_photo_detail(photo_id: int, db: sqlite3.Connection = Depends(get_d
 
 
 @router.get("/search")
-async def search_photos(
+def search_photos(
     q: str = "",
     name: str = "",
     entity_type: str = "",
@@ -153,12 +166,14 @@ async def search_photos(
     """Searches photos with full filter and sort support."""
     cursor = db.cursor()
 
+    # Entity predicates are correlated EXISTS subqueries rather than joins, so photos never
+    # multiply into duplicate rows and the query needs no DISTINCT
     conditions = ["p.status = 'processed'"]
     params: list[Any] = []
-    joins = []
 
     # Text search (Hybrid: ChromaDB + SQLite Fallback)
     if q:
+        chroma_ids: list[int] = []
         try:
             import core.chroma
             from core.clip_model import get_clip_model
@@ -190,49 +205,35 @@ async def search_photos(
                 # Keep items with distance below the model's distinct threshold
                 chroma_ids = [int(raw_ids[i]) for i in range(len(raw_ids)) if distances[i] < used_threshold]
                 
-                if chroma_ids:
-                    query = f"%{q}%"
-                    joins.append("LEFT JOIN entities eq ON p.id = eq.photo_id")
-                    placeholders = ",".join(["?"] * len(chroma_ids))
-                    conditions.append(f"(p.id IN ({placeholders}) OR p.description LIKE ? OR p.filename LIKE ? OR eq.entity_name LIKE ?)")
-                    params.extend(chroma_ids)
-                    params.extend([query, query, query])
-                else:
-                    # No good semantic matches below the threshold, fallback to standard SQLite search
-                    query = f"%{q}%"
-                    joins.append("LEFT JOIN entities eq ON p.id = eq.photo_id")
-                    conditions.append("(p.description LIKE ? OR p.filename LIKE ? OR eq.entity_name LIKE ?)")
-                    params.extend([query, query, query])
-            else:
-                # Fallback to pure SQLite search if ChromaDB returns nothing
-                query = f"%{q}%"
-                joins.append("LEFT JOIN entities eq ON p.id = eq.photo_id")
-                conditions.append("(p.description LIKE ? OR p.filename LIKE ? OR eq.entity_name LIKE ?)")
-                params.extend([query, query, query])
-                
         except Exception as e:
             # If ChromaDB fails or isn't set up, fallback to standard SQLite search
             print(f"ChromaDB search failed: {e}")
-            query = f"%{q}%"
-            joins.append("LEFT JOIN entities eq ON p.id = eq.photo_id")
-            conditions.append("(p.description LIKE ? OR p.filename LIKE ? OR eq.entity_name LIKE ?)")
-            params.extend([query, query, query])
+
+        # Semantic matches (if any) are OR-ed with the plain SQLite text search
+        text_match = (
+            "p.description LIKE ? OR p.filename LIKE ? "
+            "OR EXISTS (SELECT 1 FROM entities eq WHERE eq.photo_id = p.id AND eq.entity_name LIKE ?)"
+        )
+        if chroma_ids:
+            placeholders = ",".join(["?"] * len(chroma_ids))
+            conditions.append(f"(p.id IN ({placeholders}) OR {text_match})")
+            params.extend(chroma_ids)
+        else:
+            conditions.append(f"({text_match})")
+        query = f"%{q}%"
+        params.extend([query, query, query])
 
     # Filter by entity name
     if name:
-        joins.append("JOIN entities en ON p.id = en.photo_id")
-        conditions.append("en.entity_name = ?")
+        conditions.append("EXISTS (SELECT 1 FROM entities en WHERE en.photo_id = p.id AND en.entity_name = ?)")
         params.append(name)
 
     # Filter by entity type
-    if entity_type:
-        joins.append("JOIN entities et ON p.id = et.photo_id" if "en" not in "".join(joins) else "")
-        if entity_type == "person":
-            conditions.append(
-                "EXISTS (SELECT 1 FROM entities e2 WHERE e2.photo_id = p.id AND e2.entity_type = 'person')"
-            )
-        elif entity_type == "pet":
-            conditions.append("EXISTS (SELECT 1 FROM entities e2 WHERE e2.photo_id = p.id AND e2.entity_type = 'pet')")
+    if entity_type in ("person", "pet"):
+        conditions.append("EXISTS (SELECT 1 FROM entities e2 WHERE e2.photo_id = p.id AND e2.entity_type = ?)")
+        params.append(entity_type)
+    elif entity_type:
+        conditions.append("EXISTS (SELECT 1 FROM entities e2 WHERE e2.photo_id = p.id)")
 
     # Date range
     if date_from:
@@ -251,14 +252,14 @@ async def search_photos(
     if has_faces:
         conditions.append("EXISTS (SELECT 1 FROM entities e3 WHERE e3.photo_id = p.id AND e3.entity_type = 'person')")
 
-    # Unidentified only
+    # Unidentified only (explicit prefix range so the lookup seeks idx_entities_photo_name)
     if unidentified:
         conditions.append(
-            "EXISTS (SELECT 1 FROM entities e4 WHERE e4.photo_id = p.id AND e4.entity_name LIKE 'Unknown%')"
+            "EXISTS (SELECT 1 FROM entities e4 WHERE e4.photo_id = p.id "
+            "AND e4.entity_name >= 'Unknown' AND e4.entity_name < 'Unknowo')"
         )
 
-    join_sql = " ".join(dict.fromkeys(joins))  # Deduplicate joins
-    where_sql = " AND ".join(conditions) if conditions else "1=1"
+    where_sql = " AND ".join(conditions)
 
     # Sort
     sort_column_map = {
@@ -272,10 +273,11 @@ async def search_photos(
     order_dir = "ASC" if sort_dir.lower() == "asc" else "DESC"
     nulls = "NULLS LAST" if order_dir == "DESC" else "NULLS FIRST"
 
-    sql = f"SELECT DISTINCT p.id, p.filepath, p.filename, p.description, p.date_taken, p.date_created, p.date_modified FROM photos p {join_sql} WHERE {where_sql} ORDER BY {order_col} {order_dir} {nulls} LIMIT ?"
+    # Only whitelisted column/direction tokens are interpolated; all values are bound
+    sql = f"SELECT p.id, p.filepath, p.filename, p.description, p.date_taken, p.date_created, p.date_modified FROM photos p WHERE {where_sql} ORDER BY {order_col} {order_dir} {nulls} LIMIT ?"
     params.append(limit)
 
-    cursor.execute(sql, params)
+    cursor.execute(sql, tuple(params))
     results = cursor.fetchall()
 
     return [
@@ -293,67 +295,47 @@ async def search_photos(
 
 
 @router.get("/duplicates")
-async def get_duplicates(db: sqlite3.Connection = Depends(get_db)) -> list[dict[str, Any]]:
+def get_duplicates(db: sqlite3.Connection = Depends(get_db)) -> list[dict[str, Any]]:
     """Returns grouped duplicate files based on MD5 analysis."""
     cursor = db.cursor()
 
-    # Get all hashes that have duplicates
+    # Fetch every original and copy for all duplicated hashes in one pass, then group in Python
     cursor.execute("""
-        SELECT file_hash, COUNT(*) as duplicate_count
+        SELECT file_hash, id, filepath, filename, file_size, scanned_at, status
         FROM photos
-        WHERE status = 'duplicate' AND file_hash IS NOT NULL
-        GROUP BY file_hash
+        WHERE status IN ('processed', 'duplicate')
+          AND file_hash IN (
+              SELECT file_hash FROM photos
+              WHERE status = 'duplicate' AND file_hash IS NOT NULL
+              GROUP BY file_hash
+          )
+        ORDER BY file_hash, id
     """)
-    hash_groups = cursor.fetchall()
-
-    response_data = []
-
-    for file_hash, duplicate_count in hash_groups:
-        cursor.execute(
-            """
-            SELECT id, filepath, filename, file_size, scanned_at
-            FROM photos
-            WHERE file_hash = ? AND status = 'processed'
-            LIMIT 1
-        """,
-            (file_hash,),
-        )
-        original = cursor.fetchone()
-
-        cursor.execute(
-            """
-            SELECT id, filepath, filename, file_size, scanned_at
-            FROM photos
-            WHERE file_hash = ? AND status = 'duplicate'
-        """,
-            (file_hash,),
-        )
-        duplicates = cursor.fetchall()
-
-        if original and duplicates:
-            response_data.append(
-                {
-                    "hash": file_hash,
-                    "count": duplicate_count,
-                    "original": {
-                        "id": original[0],
-                        "filepath": original[1],
-                        "filename": original[2],
-                        "file_size": original[3],
-                        "scanned_at": original[4],
-                    },
-                    "copies": [
-                        {"id": dup[0], "filepath": dup[1], "filename": dup[2], "file_size": dup[3], "scanned_at": dup[4]}
-                        for dup in duplicates
-                    ],
-                }
-            )
-
-    return response_data
+
+    groups: dict[str, dict[str, Any]] = defaultdict(lambda: {"original": None, "copies": []})
+    for file_hash, photo_id, filepath, filename, file_size, scanned_at, status in cursor.fetchall():
+        photo = {
+            "id": photo_id,
+            "filepath": filepath,
+            "filename": filename,
+            "file_size": file_size,
+            "scanned_at": scanned_at,
+        }
+        group = groups[file_hash]
+        if status == "duplicate":
+            group["copies"].append(photo)
+        elif group["original"] is None:
+            group["original"] = photo
+
+    return [
+        {"hash": file_hash, "count": len(group["copies"]), "original": group["original"], "copies": group["copies"]}
+        for file_hash, group in groups.items()
+        if group["original"] and group["copies"]
+    ]
 
 
 @router.get("/skipped")
-async def get_skipped(db: sqlite3.Connection = Depends(get_db)) -> list[dict[str, Any]]:
+def get_skipped(db: sqlite3.Connection = Depends(get_db)) -> list[dict[str, Any]]:
     """Returns files that were explicitly skipped during import (e.g., screenshots)."""
     cursor = db.cursor()
     cursor.execute(
@@ -379,81 +361,87 @@ async def get_skipped(db: sqlite3.Connection = Depends(get_db)) -> list[dict[str
     ]
 
 
-@lru_cache(maxsize=1)
-def _compute_gallery_filters(db_file: str) -> dict[str, Any]:
-    """Deterministically cache the gallery filters to avoid redundant DB aggregation queries."""
-    conn = sqlite3.connect(db_file)
-    cursor = conn.cursor()
+_GALLERY_FILTERS_SQL = """
+    SELECT
+        (SELECT json_group_array(json_object('name', entity_name, 'type', entity_type))
+         FROM (SELECT DISTINCT entity_name, entity_type FROM entities
+               WHERE entity_name NOT LIKE 'Unknown%' ORDER BY entity_name)) AS names,
+        (SELECT json_group_array(camera)
+         FROM (SELECT DISTINCT camera_make || ' ' || camera_model AS camera FROM photos
+               WHERE camera_make IS NOT NULL AND camera_make != '' AND status = 'processed' ORDER BY 1)) AS cameras,
+        (SELECT MIN(date_taken) FROM photos
+         WHERE date_taken IS NOT NULL AND date_taken != '' AND status = 'processed') AS date_min,
+        (SELECT MAX(date_taken) FROM photos
+         WHERE date_taken IS NOT NULL AND date_taken != '' AND status = 'processed') AS date_max,
+        (SELECT COUNT(*) FROM photos WHERE status = 'processed') AS total_photos,
+        (SELECT COUNT(DISTINCT e.photo_id) FROM entities e JOIN photos p ON e.photo_id = p.id
+         WHERE e.entity_type = 'person' AND p.status = 'processed') AS photos_with_faces,
+        (SELECT COUNT(DISTINCT e.photo_id) FROM entities e JOIN photos p ON e.photo_id = p.id
+         WHERE e.entity_name LIKE 'Unknown%' AND p.status = 'processed') AS photos_unidentified
+"""
 
-    # Get all unique named entities (non-Unknown)
-    cursor.execute(
-        "SELECT DISTINCT entity_name, entity_type FROM entities WHERE entity_name NOT LIKE 'Unknown%' ORDER BY entity_name"
-    )
-    named_entities = [{"name": r[0], "type": r[1]} for r in cursor.fetchall()]
 
-    # Get all unique cameras
-    cursor.execute(
-        "SELECT DISTINCT camera_make || ' ' || camera_model FROM photos WHERE camera_make IS NOT NULL AND camera_make != '' AND status = 'processed' ORDER BY 1"
-    )
-    cameras = [r[0] for r in cursor.fetchall() if r[0] and r[0].strip()]
+def _compute_gallery_filters(db_file: str) -> dict[str, Any]:
+    """Aggregates the gallery filter options from the database in a single query."""
+    # All aggregates come back as one row; the two list columns are JSON arrays
+    with pool.connection(db_file) as conn:
+        row = conn.execute(_GALLERY_FILTERS_SQL).fetchone()
+    names_json, cameras_json, date_min, date_max, total_photos, photos_with_faces, photos_unidentified = row
 
-    # Get date range
-    cursor.execute(
-        "SELECT MIN(date_taken), MAX(date_taken) FROM photos WHERE date_taken IS NOT NULL AND date_taken != '' AND status = 'processed'"
-    )
-    date_range = cursor.fetchone()
+    return {
+        "names": json.loads(names_json),
+        "cameras": [c for c in json.loads(cameras_json) if c and c.strip()],
+        "date_min": date_min,
+        "date_max": date_max,
+        "total_photos": total_photos,
+        "photos_with_faces": photos_with_faces,
+        "photos_unidentified": photos_unidentified,
+    }
 
-    # Counts for quick stats
-    cursor.execute(
-        "SELECT COUNT(DISTINCT e.photo_id) FROM entities e JOIN photos p ON e.photo_id = p.id WHERE e.entity_type = 'person' AND p.status = 'processed'"
-    )
-    photos_with_faces = cursor.fetchone()[0]
 
-    cursor.execute(
-        "SELECT COUNT(DISTINCT e.photo_id) FROM entities e JOIN photos p ON e.photo_id = p.id WHERE e.entity_name LIKE 'Unknown%' AND p.status = 'processed'"
+def _gallery_filters_are_fresh(db_file: str) -> bool:
+    cache = _gallery_filters_cache
+    return (
+        cache["db_file"] == db_file
+        and cache["at"] > cache["dirty_at"]
+        and time.monotonic() - cache["at"] < GALLERY_FILTERS_TTL
     )
-    photos_unidentified = cursor.fetchone()[0]
 
-    cursor.execute("SELECT COUNT(*) FROM photos WHERE status = 'processed'")
-    total_photos = cursor.fetchone()[0]
 
-    conn.close()
+def _get_cached_gallery_filters(db_file: str) -> dict[str, Any]:
+    """Returns cached gallery filters, letting concurrent callers share a single recompute."""
+    if _gallery_filters_are_fresh(db_file):
+        return _gallery_filters_cache["data"]
 
-    return {
-        "names": named_entities,
-        "cameras": cameras,
-        "date_min": date_range[0] if date_range else None,
-        "date_max": date_range[1] if date_range else None,
-        "total_photos": total_photos,
-        "photos_with_faces": photos_with_faces,
-        "photos_unidentified": photos_unidentified,
-    }
+    with _gallery_filters_lock:
+        # Another request may have refreshed the cache while we waited for the lock
+        if _gallery_filters_are_fresh(db_file):
+            return _gallery_filters_cache["data"]
+
+        # Stamp with the start time so an invalidation during the query keeps the result stale
+        started_at = time.monotonic()
+        data = _compute_gallery_filters(db_file)
+        _gallery_filters_cache.update(at=started_at, db_file=db_file, data=data)
+        return data
 
 
 @router.get("/gallery/filters")
-async def get_gallery_filters() -> dict[str, Any]:
+def get_gallery_filters() -> dict[str, Any]:
     """Returns available filter options dynamically computed for the frontend gallery."""
-    # We call the cached synchronous method (cannot lru_cache the async route directly well)
-    return _compute_gallery_filters(DB_FILE)
+    return _get_cached_gallery_filters(DB_FILE)
 
 
 @router.get("/gallery/years")
-async def get_gallery_years(db: sqlite3.Connection = Depends(get_db)) -> list[dict[str, Any]]:
+def get_gallery_years(db: sqlite3.Connection = Depends(get_db)) -> list[dict[str, Any]]:
     """Returns years that have photos, with counts, for the timeline sidebar."""
     cursor = db.cursor()
-    cursor.execute("""
-        SELECT SUBSTR(date_taken, 1, 4) as year, COUNT(*) as count
-        FROM photos
-        WHERE date_taken IS NOT NULL AND date_taken != '' AND status = 'processed'
-        GROUP BY year
-        ORDER BY year DESC
-    """)
+    cursor.execute(_SQL_GALLERY_YEARS)
     years = [{"year": r[0], "count": r[1]} for r in cursor.fetchall() if r[0] and r[0].strip()]
     return years
 
 
 @router.get("/similar/{photo_id}")
-async def get_similar_photos(photo_id: int, db: sqlite3.Connection = Depends(get_db)) -> list[dict[str, Any]]:
+def get_similar_photos(photo_id: int, db: sqlite3.Connection = Depends(get_db)) -> list[dict[str, Any]]:
     """Finds visually/semantically similar photos using ChromaDB."""
     try:
         import core.chroma
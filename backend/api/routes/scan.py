@@ -180,6 +180,10 @@ async def scan_directory(
     )
     db.commit()
 
+    # Refresh planner statistics once after a bulk insert so search joins pick the right indexes
+    if added_count > 0:
+        cursor.execute("ANALYZE")
+
     # Record scan history
     try:
         cursor.execute(
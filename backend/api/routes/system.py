@@ -17,6 +17,7 @@ import core.state as state
 from backup_db import backup_database
 import core.config as config
 from core.config import DB_FILE, DB_TEST_FILE, VERSION
+from core.database import pool
 from models.schemas import DatabaseCleanRequest, RestoreRequest, SettingsUpdateRequest
 from restore_db import restore_database
 
@@ -75,9 +76,9 @@ async def clean_database(req: DatabaseCleanRequest) -> dict[str, Any]:
                 state.add_log(f"Warning: Failed to wipe ChromaDB collections: {e}")
 
         # Invalidate the gallery filter cache so the UI updates
-        from api.routes.gallery import _compute_gallery_filters
+        from api.routes.gallery import clear_gallery_filters_cache
 
-        _compute_gallery_filters.cache_clear()
+        clear_gallery_filters_cache()
 
         return {"message": f"{req.target.title()} database cleaned successfully"}
     except Exception as e:
@@ -129,10 +130,12 @@ async def trigger_restore(req: RestoreRequest) -> dict[str, Any]:
         success = restore_database(req.filename)
         if success:
             chroma.reset_chroma_client()
-            # Since restore drops all entities, we must inevitably clear our LRU caches
-            from api.routes.gallery import _compute_gallery_filters
+            # Pooled connections still point at the replaced database file
+            pool.close_all()
+            # Since restore drops all entities, we must inevitably invalidate our caches
+            from api.routes.gallery import clear_gallery_filters_cache
 
-            _compute_gallery_filters.cache_clear()
+            clear_gallery_filters_cache()
 
             return {"message": "Database restored successfully"}
         else:
@@ -2,37 +2,111 @@
 Dependency injection definitions for yielding SQLite connections to FastAPI routers.
 """
 
+import queue
 import sqlite3
-from collections.abc import Generator
+import threading
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
 
 from core.config import DB_FILE, DB_TEST_FILE
 
+# Idle connections kept per database file; bursts beyond this open short-lived extras
+POOL_SIZE = 8
+
+# Prepared statements cached per connection (sqlite3 defaults to 128)
+STATEMENT_CACHE_SIZE = 256
+
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA cache_size=-64000;",
+    "PRAGMA mmap_size=268435456;",
+    "PRAGMA temp_store=MEMORY;",
+)
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Opens a new SQLite connection with the application's standard PRAGMA tuning applied."""
+    conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30.0, cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class ConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections keyed by database path.
+
+    Reusing connections keeps SQLite's per-connection page cache warm across
+    requests and skips re-opening the file and re-applying PRAGMAs each time.
+    """
+
+    def __init__(self, max_size: int = POOL_SIZE) -> None:
+        self.max_size = max_size
+        self._queues: dict[str, queue.Queue[sqlite3.Connection]] = {}
+        self._lock = threading.Lock()
+
+    def _queue_for(self, db_path: str) -> queue.Queue[sqlite3.Connection]:
+        with self._lock:
+            idle = self._queues.get(db_path)
+            if idle is None:
+                idle = self._queues[db_path] = queue.Queue(maxsize=self.max_size)
+            return idle
+
+    def acquire(self, db_path: str) -> sqlite3.Connection:
+        """Takes an idle connection for `db_path`, opening a new one when none are free."""
+        try:
+            return self._queue_for(db_path).get_nowait()
+        except queue.Empty:
+            return connect(db_path)
+
+    def release(self, db_path: str, conn: sqlite3.Connection) -> None:
+        """Returns a connection to the pool, discarding any uncommitted work first."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+            self._queue_for(db_path).put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            conn.close()
+
+    @contextmanager
+    def connection(self, db_path: str) -> Iterator[sqlite3.Connection]:
+        """Context manager that acquires a pooled connection and always releases it."""
+        conn = self.acquire(db_path)
+        try:
+            yield conn
+        finally:
+            self.release(db_path, conn)
+
+    def close_all(self) -> None:
+        """Closes every idle connection, e.g. after the database file has been replaced."""
+        with self._lock:
+            queues = list(self._queues.values())
+            self._queues.clear()
+        for idle in queues:
+            while True:
+                try:
+                    idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+pool = ConnectionPool()
+
 
 def get_db() -> Generator[sqlite3.Connection, None, None]:
     """
-    FastAPI Dependency: Yields a fresh uncommitted database session for the request scope,
-    ensuring it correctly closes out upon termination.
+    FastAPI Dependency: Yields a pooled database session for the request scope,
+    rolling back anything left uncommitted when the request finishes.
     """
-    conn = sqlite3.connect(DB_FILE, check_same_thread=False, timeout=30.0)
-    conn.execute("PRAGMA journal_mode=WAL;")
-    conn.execute("PRAGMA synchronous=NORMAL;")
-    conn.execute("PRAGMA cache_size=-64000;")
-    try:
+    with pool.connection(DB_FILE) as conn:
         yield conn
-    finally:
-        conn.close()
 
 
 def get_test_db() -> Generator[sqlite3.Connection, None, None]:
     """
-    FastAPI Dependency: Yields a fresh connection exclusively for the sandbox test database.
+    FastAPI Dependency: Yields a pooled connection exclusively for the sandbox test database.
     Prevents cross-contamination of isolated UI tests with the permanent user gallery.
     """
-    conn = sqlite3.connect(DB_TEST_FILE, check_same_thread=False, timeout=30.0)
-    conn.execute("PRAGMA journal_mode=WAL;")
-    conn.execute("PRAGMA synchronous=NORMAL;")
-    conn.execute("PRAGMA cache_size=-64000;")
-    try:
+    with pool.connection(DB_TEST_FILE) as conn:
         yield conn
-    finally:
-        conn.close()
@@ -211,6 +211,12 @@ def init_single_db(db_path: str) -> None:
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_entities_entity_name ON entities(entity_name)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_entities_type_name ON entities(entity_type, entity_name)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_photos_status_date_taken ON photos(status, date_taken)")
+    # Serve the per-photo EXISTS filters in search_photos straight from the index
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entities_photo_type ON entities(photo_id, entity_type)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entities_photo_name ON entities(photo_id, entity_name)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_entities_unk ON entities(entity_name, entity_type, photo_id, id)"
+    )
 
     conn.commit()
     conn.close()
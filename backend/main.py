@@ -6,12 +6,14 @@ for the frontend client, triggers database initialization callbacks, and
 includes the unified APIRouter containing all refactored domain routes.
 """
 
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 
 from api.router import api_router
 from core.config import DB_FILE, VERSION
+from core.database import pool
 from database_setup import init_db
 from services.scan_sessions import recover_interrupted_sessions
 
@@ -32,6 +34,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Plain `def` routes run on anyio's worker threads; size the pool for concurrent WAL readers
+THREADPOOL_TOKENS = 64
+
 # Initialize application endpoints
 app.include_router(api_router)
 
@@ -39,6 +44,7 @@ app.include_router(api_router)
 @app.on_event("startup")
 async def startup_event() -> None:
     """Application startup hook triggering local database initialization."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
     init_db()
     import sqlite3
 
@@ -47,6 +53,12 @@ async def startup_event() -> None:
     conn.close()
 
 
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """Application shutdown hook closing pooled SQLite connections."""
+    pool.close_all()
+
+
 if __name__ == "__main__":
     import uvicorn
 
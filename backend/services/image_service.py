@@ -1,10 +1,13 @@
 import base64
 import io
 import os
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from typing import Any
 
+import numpy as np
 import requests
 from PIL import Image
 from PIL.ExifTags import TAGS
@@ -19,6 +22,18 @@ try:
 except ImportError:
     pass  # pillow-heif not installed; HEIC processing will fail gracefully
 
+# libvips streams large HEICs tile by tile instead of decoding the full raster into memory
+try:
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None  # pyvips/libvips not installed; HEIC caching falls back to Pillow
+
+# simplejpeg calls libjpeg-turbo directly, skipping Pillow's encoder and BytesIO round-trip
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None  # simplejpeg not installed; in-memory JPEG encoding uses Pillow
+
 HEIC_EXTENSIONS = {".heic", ".heif"}
 
 
@@ -251,6 +266,24 @@ def resize_image_for_ollama(filepath: str, max_size: int = 1024) -> str | None:
         return None
 
 
+def encode_jpeg_bytes(img: Image.Image, quality: int = 90) -> bytes:
+    """Encode a PIL image as JPEG bytes, preferring simplejpeg when it is installed.
+
+    Args:
+        img (Image.Image): The image to encode.
+        quality (int): JPEG quality from 1 to 100.
+
+    Returns:
+        bytes: The JPEG-encoded image data.
+    """
+    rgb_img = img.convert("RGB")
+    if simplejpeg is not None:
+        return simplejpeg.encode_jpeg(np.asarray(rgb_img), quality=quality, colorspace="RGB", fastdct=True)
+    buf = io.BytesIO()
+    rgb_img.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
 def _convert_heic_to_jpeg_bytes(filepath: str) -> bytes:
     """Convert a HEIC/HEIF image to JPEG bytes in memory.
 
@@ -261,10 +294,86 @@ def _convert_heic_to_jpeg_bytes(filepath: str) -> bytes:
         bytes: The JPEG-encoded image data.
     """
     with Image.open(filepath) as img:
-        rgb_img = img.convert("RGB")
-        buf = io.BytesIO()
-        rgb_img.save(buf, format="JPEG", quality=90)
-        return buf.getvalue()
+        return encode_jpeg_bytes(img)
+
+
+# Background pool that pre-renders browser-friendly JPEG copies of HEIC files
+_heic_cache_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="heic-cache")
+_heic_cache_pending: dict[str, Future] = {}
+_heic_cache_lock = threading.Lock()
+
+
+def heic_cache_path(filepath: str) -> str:
+    """Returns the path of the cached JPEG rendition stored alongside a HEIC/HEIF file."""
+    return filepath + ".jpg"
+
+
+def _save_jpeg_with_vips(filepath: str, dest_path: str) -> bool:
+    """Encode `filepath` as a JPEG at `dest_path` using libvips, returning False if unavailable or failing."""
+    if pyvips is None:
+        return False
+    try:
+        pyvips.Image.new_from_file(filepath, access="sequential").jpegsave(dest_path, Q=90, optimize_coding=True)
+        return True
+    except Exception:
+        return False
+
+
+def cache_heic_as_jpeg(filepath: str) -> str:
+    """Convert a HEIC/HEIF image to a JPEG next to the original, if not already cached.
+
+    The JPEG is written to a temporary file and renamed into place so readers
+    never observe a partially written image.
+
+    Args:
+        filepath (str): The path to the HEIC/HEIF image file.
+
+    Returns:
+        str: The path of the cached JPEG.
+    """
+    cached_path = heic_cache_path(filepath)
+    if not os.path.exists(cached_path):
+        tmp_path = f"{cached_path}.{threading.get_ident()}.tmp"
+        try:
+            if not _save_jpeg_with_vips(filepath, tmp_path):
+                img = Image.open(filepath)
+                try:
+                    img.save(tmp_path, format="JPEG", quality=90)
+                finally:
+                    img.close()
+            os.replace(tmp_path, cached_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return cached_path
+
+
+def schedule_heic_cache(filepath: str) -> Future | None:
+    """Queue a background HEIC→JPEG conversion so the first gallery view is served from disk.
+
+    Args:
+        filepath (str): The path to the image file. Non-HEIC files are ignored.
+
+    Returns:
+        Future | None: The pending conversion, or None when nothing needs converting.
+    """
+    if os.path.splitext(filepath)[1].lower() not in HEIC_EXTENSIONS:
+        return None
+    if os.path.exists(heic_cache_path(filepath)):
+        return None
+
+    with _heic_cache_lock:
+        future = _heic_cache_pending.get(filepath)
+        if future is None:
+            future = _heic_cache_executor.submit(cache_heic_as_jpeg, filepath)
+            _heic_cache_pending[filepath] = future
+            future.add_done_callback(lambda _f: _forget_heic_cache_job(filepath))
+        return future
+
+
+def _forget_heic_cache_job(filepath: str) -> None:
+    with _heic_cache_lock:
+        _heic_cache_pending.pop(filepath, None)
 
 
 def encode_image_to_base64(filepath: str) -> str:
@@ -25,7 +25,12 @@ import core.config as config
 from core.config import DB_FILE
 import core.chroma
 from database_setup import find_best_face_match
-from services.image_service import extract_exif_for_filters, process_image_with_ollama, warm_ollama_model
+from services.image_service import (
+    extract_exif_for_filters,
+    process_image_with_ollama,
+    schedule_heic_cache,
+    warm_ollama_model,
+)
 from services.scan_sessions import get_resumable_session, set_session_status
 
 
@@ -197,6 +202,7 @@ def background_processor() -> None:
             ),
         )
         conn.commit()  # Commit immediately so description is saved even if DeepFace fails
+        schedule_heic_cache(filepath)  # Pre-render the gallery JPEG while faces are analysed
 
         # Insert description into ChromaDB for semantic search
         if description:
@@ -50,7 +50,11 @@ def mock_db_file(tmp_path, monkeypatch):
     from database_setup import init_db
 
     init_db()
-    return db_path
+    yield db_path
+
+    from core.database import pool
+
+    pool.close_all()
 
 
 @pytest.fixture
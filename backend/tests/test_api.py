@@ -91,6 +91,37 @@ def test_get_filters(client, mock_db_file):
     assert data["names"][0]["name"] == "Fido"
 
 
+def test_get_filters_aggregates(client, mock_db_file):
+    """Test that camera, date range, and count aggregates are returned together."""
+    seed_test_database(mock_db_file)
+    conn = sqlite3.connect(mock_db_file)
+    conn.execute("UPDATE photos SET camera_make = 'Canon', camera_model = 'EOS' WHERE id = 1")
+    conn.commit()
+    conn.close()
+
+    data = client.get("/api/gallery/filters").json()
+
+    assert data["cameras"] == ["Canon EOS"]
+    assert data["date_min"] == "2024-06-15"
+    assert data["date_max"] == "2025-01-01"
+    assert data["total_photos"] == 2
+    assert data["photos_with_faces"] == 1
+    assert data["photos_unidentified"] == 1
+
+
+def test_gallery_filters_cached_until_invalidated(client, mock_db_file):
+    """Filters are served from cache until a mutation marks them dirty."""
+    from api.routes.gallery import clear_gallery_filters_cache
+
+    assert client.get("/api/gallery/filters").json()["total_photos"] == 0
+
+    seed_test_database(mock_db_file)
+    assert client.get("/api/gallery/filters").json()["total_photos"] == 0
+
+    clear_gallery_filters_cache()
+    assert client.get("/api/gallery/filters").json()["total_photos"] == 2
+
+
 def test_force_rescan_clears_gallery_filter_cache(client, mock_db_file, tmp_path):
     """Force rescan should invalidate cached gallery filter metadata immediately."""
     seed_test_database(mock_db_file)
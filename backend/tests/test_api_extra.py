@@ -202,6 +202,35 @@ def test_get_duplicates(client, mock_db_file, dummy_img):
     assert data[0]["hash"] == "hash123"
 
 
+def test_get_duplicates_groups_multiple_hashes(client, mock_db_file):
+    conn = sqlite3.connect(mock_db_file)
+    c = conn.cursor()
+    rows = [
+        (20, "/a/orig.jpg", "orig.jpg", "hashA", "processed"),
+        (21, "/a/copy1.jpg", "copy1.jpg", "hashA", "duplicate"),
+        (22, "/a/copy2.jpg", "copy2.jpg", "hashA", "duplicate"),
+        (23, "/b/orig.jpg", "orig.jpg", "hashB", "processed"),
+        (24, "/b/copy.jpg", "copy.jpg", "hashB", "duplicate"),
+        # Orphaned copy without a processed original is not reported
+        (25, "/c/copy.jpg", "copy.jpg", "hashC", "duplicate"),
+    ]
+    c.executemany(
+        "INSERT INTO photos (id, filepath, filename, file_hash, file_size, status) VALUES (?, ?, ?, ?, 100, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+    resp = client.get("/api/duplicates")
+    assert resp.status_code == 200
+    data = {group["hash"]: group for group in resp.json()}
+    assert set(data) == {"hashA", "hashB"}
+    assert data["hashA"]["count"] == 2
+    assert data["hashA"]["original"]["id"] == 20
+    assert [copy["id"] for copy in data["hashA"]["copies"]] == [21, 22]
+    assert data["hashB"]["copies"][0]["filepath"] == "/b/copy.jpg"
+
+
 def test_open_system_file_and_location(client, monkeypatch):
     import os
     import subprocess
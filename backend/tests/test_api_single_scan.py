@@ -116,6 +116,33 @@ def test_unidentified_endpoint(client, mock_db_file, dummy_img):
     assert resp.status_code == 200
 
 
+def test_unidentified_endpoint_returns_first_instance_per_name(client, mock_db_file, dummy_img):
+    conn = sqlite3.connect(mock_db_file)
+    c = conn.cursor()
+    c.execute(
+        "INSERT INTO photos (id, filepath, filename, status) VALUES (?, ?, ?, ?)",
+        (99, dummy_img, "unid.jpg", "processed"),
+    )
+    c.executemany(
+        "INSERT INTO entities (id, photo_id, entity_type, entity_name) VALUES (?, ?, ?, ?)",
+        [
+            (7, 99, "person", "Unknown Person 1"),
+            (5, 99, "person", "Unknown Person 1"),
+            (6, 99, "pet", "Unknown Dog"),
+            (8, 99, "person", "Alice"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    resp = client.get("/api/unidentified")
+    assert resp.status_code == 200
+    by_name = {item["name"]: item for item in resp.json()}
+    assert set(by_name) == {"Unknown Person 1", "Unknown Dog"}
+    assert by_name["Unknown Person 1"]["id"] == 5
+    assert by_name["Unknown Person 1"]["photo_id"] == 99
+
+
 def test_photo_entities(client, mock_db_file, dummy_img):
     resp = client.get("/api/photo/99/entities")
     assert resp.status_code == 200
@@ -278,3 +278,26 @@ def test_process_image_with_ollama_failure():
     with patch("services.image_service.encode_image_to_base64", return_value="encoded_data"):
         res = image_service.process_image_with_ollama("dummy.jpg", url, model)
         assert res is None
+
+
+def test_schedule_heic_cache_writes_jpeg_sidecar(tmp_path):
+    heic_file = tmp_path / "IMG_0001.heic"
+    Image.new("RGB", (4, 4), color="green").save(heic_file, "JPEG")
+
+    future = image_service.schedule_heic_cache(str(heic_file))
+    assert future is not None
+    cached_path = future.result(timeout=10)
+
+    assert cached_path == str(heic_file) + ".jpg"
+    with Image.open(cached_path) as img:
+        assert img.format == "JPEG"
+
+    # Already cached and non-HEIC files need no work
+    assert image_service.schedule_heic_cache(str(heic_file)) is None
+    assert image_service.schedule_heic_cache(str(tmp_path / "photo.jpg")) is None
+
+
+def test_encode_jpeg_bytes_pillow_fallback(monkeypatch):
+    monkeypatch.setattr(image_service, "simplejpeg", None)
+    data = image_service.encode_jpeg_bytes(Image.new("RGBA", (8, 8), color="red"))
+    assert data[:2] == b"\xff\xd8"
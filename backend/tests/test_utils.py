@@ -37,3 +37,24 @@ def test_extract_gps_from_exif_empty_image(tmp_path):
 
     result = extract_gps_from_exif(str(empty_file))
     assert result == {"gps_lat": None, "gps_lon": None}
+
+
+def test_connection_pool_reuses_and_resets(tmp_path):
+    from core.database import ConnectionPool
+
+    pool = ConnectionPool(max_size=1)
+    db_path = str(tmp_path / "pool.db")
+
+    with pool.connection(db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+        first = conn
+
+    # Uncommitted work is rolled back and the same connection is handed out again
+    with pool.connection(db_path) as conn:
+        assert conn is first
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+    pool.close_all()
@@ -4,7 +4,7 @@ import sqlite3
 import pytest
 
 from services.scan_worker import background_processor
-from api.routes.gallery import _compute_gallery_filters
+from api.routes.gallery import _get_cached_gallery_filters, clear_gallery_filters_cache
 
 
 @pytest.fixture
@@ -190,8 +190,8 @@ def test_background_processor_corrupted_file(mock_db_file, tmp_path, monkeypatch
 
 def test_background_processor_clears_gallery_filter_cache(mock_db_file, test_image, mock_ollama, monkeypatch):
     """Processing a pending image should invalidate cached gallery filters."""
-    _compute_gallery_filters.cache_clear()
-    initial_filters = _compute_gallery_filters(mock_db_file)
+    clear_gallery_filters_cache()
+    initial_filters = _get_cached_gallery_filters(mock_db_file)
     assert initial_filters["total_photos"] == 0
 
     seed_db_for_processing(mock_db_file, test_image)
@@ -204,7 +204,7 @@ def test_background_processor_clears_gallery_filter_cache(mock_db_file, test_ima
 
     background_processor()
 
-    refreshed_filters = _compute_gallery_filters(mock_db_file)
+    refreshed_filters = _get_cached_gallery_filters(mock_db_file)
     assert refreshed_filters["total_photos"] == 1
 
 